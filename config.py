@@ -3,15 +3,40 @@ Configuration file for ProtoML
 Store your API keys and settings here
 """
 
+import functools
 import os
+from types import SimpleNamespace
+
 from dotenv import load_dotenv
 
-load_dotenv()
+# Output Directories
+OUTPUT_DIR = "output"
+PDF_CACHE_DIR = os.path.join(OUTPUT_DIR, "pdf_cache")
+EMBEDDINGS_DIR = os.path.join(OUTPUT_DIR, "embeddings")
+REPORTS_DIR = os.path.join(OUTPUT_DIR, "reports")
+
+
+@functools.lru_cache(maxsize=1)
+def _init() -> SimpleNamespace:
+    """Parse .env and create output directories exactly once per process,
+    even if this module is re-imported or reloaded"""
+    load_dotenv()
+
+    for directory in (OUTPUT_DIR, PDF_CACHE_DIR, EMBEDDINGS_DIR, REPORTS_DIR):
+        os.makedirs(directory, exist_ok=True)
+
+    return SimpleNamespace(
+        GROQ_API_KEY=os.getenv("GROQ_API_KEY", ""),
+        GEMINI_API_KEY=os.getenv("GEMINI_API_KEY", ""),
+        DISCORD_WEBHOOK_URL=os.getenv("DISCORD_WEBHOOK_URL", ""),
+    )
+
 
 # API Keys (set these in .env file)
-GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL", "")
+_env = _init()
+GROQ_API_KEY = _env.GROQ_API_KEY
+GEMINI_API_KEY = _env.GEMINI_API_KEY
+DISCORD_WEBHOOK_URL = _env.DISCORD_WEBHOOK_URL
 
 # arXiv Configuration
 ARXIV_CATEGORIES = [
@@ -24,14 +49,29 @@ ARXIV_CATEGORIES = [
 
 MAX_PAPERS_PER_CATEGORY = 3  # Fetch top 3 from each category to get ~10 papers total
 TOTAL_PAPERS_TO_FETCH = 10
+ARXIV_CACHE_TTL_SECONDS = 3600  # Reuse fetched paper lists for an hour
 
 # Paper Selection Configuration
 PAPERS_PER_AGENT = 5  # Split papers 5+5 between Groq and Gemini
+MAX_SCORING_BATCH = 5  # Papers marshalled into a single scoring request
 
 # LLM Model Configuration
 GROQ_MODEL = "llama-3.3-70b-versatile"  # or "mixtral-8x7b-32768"
 GEMINI_MODEL = "gemini-2.5-flash"  # or "gemini-1.5-pro"
 
+# Rate Limits (requests/min and tokens/min; free-tier defaults, raise for paid plans)
+GROQ_RPM = 30
+GROQ_TPM = 6000
+GEMINI_RPM = 10
+GEMINI_TPM = 250000
+
+# Agent Debate Configuration
+DEBATE_CONTEXT_MAX_TOKENS = 1200  # Summarize debate history past this size
+DEBATE_EPSILON = 0.5  # Skip the debate when top scores differ by less than this
+
+# LLM Response Cache
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600  # Re-use cached completions for a week
+
 # Scoring Criteria Weights
 SCORING_WEIGHTS = {
     "problem_relevance": 0.25,
@@ -47,15 +87,3 @@ CHUNK_SIZE = 1000  # Characters per chunk for PDF processing
 # Discord Configuration
 DISCORD_ENABLED = True
 DISCORD_USERNAME = "ProtoML"
-
-# Output Directories
-OUTPUT_DIR = "output"
-PDF_CACHE_DIR = os.path.join(OUTPUT_DIR, "pdf_cache")
-EMBEDDINGS_DIR = os.path.join(OUTPUT_DIR, "embeddings")
-REPORTS_DIR = os.path.join(OUTPUT_DIR, "reports")
-
-# Create output directories if they don't exist
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-os.makedirs(PDF_CACHE_DIR, exist_ok=True)
-os.makedirs(EMBEDDINGS_DIR, exist_ok=True)
-os.makedirs(REPORTS_DIR, exist_ok=True)
@@ -1,8 +1,11 @@
+import asyncio
 import json
 from typing import List, Dict, Optional, Tuple
-from groq import Groq
+from groq import AsyncGroq, Groq
 from google import genai
 from google.genai import types
+from helper.json_utils import extract_json
+from helper.paper import Paper
 import config
 
 
@@ -12,6 +15,7 @@ class AgentDebate:
     def __init__(self):
         # Initialize Groq
         self.groq_client = Groq(api_key=config.GROQ_API_KEY)
+        self.groq_async_client = AsyncGroq(api_key=config.GROQ_API_KEY)
         self.groq_model = config.GROQ_MODEL
         
         # Initialize Gemini with new API
@@ -20,6 +24,10 @@ class AgentDebate:
         
         # Store conversation history for context
         self.conversation_context = []
+
+        # Server-side cached debate briefing (created per debate, may be None
+        # when the content is below the provider's minimum cacheable size)
+        self._gemini_cache = None
     
     def _add_to_context(self, role: str, content: str, round_num: int) -> None:
         """Add message to conversation context for multi-turn debate"""
@@ -29,6 +37,42 @@ class AgentDebate:
             "round": round_num
         })
     
+    def _estimate_context_tokens(self) -> int:
+        """Rough token estimate for the stored context (~4 chars per token)"""
+        return sum(len(msg['content']) for msg in self.conversation_context) // 4
+
+    def _summarize_context(self, max_tokens: int = None) -> None:
+        """Bound the stored debate context once it grows too large
+
+        Keeps the first and latest messages verbatim and collapses
+        everything in between into one truncated entry. The debate prompts
+        receive their inputs as explicit arguments, so this only bounds the
+        memory held by conversation_context — an LLM summary here would
+        cost a round-trip without shrinking any prompt.
+        """
+        max_tokens = max_tokens or config.DEBATE_CONTEXT_MAX_TOKENS
+
+        if len(self.conversation_context) <= 3:
+            return
+        if self._estimate_context_tokens() <= max_tokens:
+            return
+
+        middle = self.conversation_context[1:-1]
+        history = "\n\n".join(
+            f"Round {msg['round']} - {msg['role']}:\n{msg['content']}"
+            for msg in middle
+        )
+
+        self.conversation_context = [
+            self.conversation_context[0],
+            {
+                "role": "Summary",
+                "content": history[:800],
+                "round": self.conversation_context[-2]['round']
+            },
+            self.conversation_context[-1],
+        ]
+
     def _get_context_summary(self) -> str:
         """Generate summary of conversation context for agents"""
         if not self.conversation_context:
@@ -42,9 +86,9 @@ class AgentDebate:
     
     def select_final_paper(
         self,
-        groq_papers: List[Dict],
-        gemini_papers: List[Dict]
-    ) -> Dict:
+        groq_papers: List[Paper],
+        gemini_papers: List[Paper]
+    ) -> Paper:
        
         print("\n💬 Starting agent debate...")
         
@@ -68,64 +112,181 @@ class AgentDebate:
             selected_paper['debate_history'] = []
             return selected_paper
         
+        # Near-agreement: when the top scores are within epsilon, the debate
+        # rarely changes the outcome — pick the higher score deterministically
+        # and save the three LLM calls
+        score_diff = groq_top['groq_total_score'] - gemini_top['gemini_total_score']
+        if abs(score_diff) < config.DEBATE_EPSILON:
+            print(f"\n✅ Top scores within {config.DEBATE_EPSILON} of each other — skipping debate.")
+            selected_paper = (groq_top if score_diff >= 0 else gemini_top).copy()
+            selected_paper['selection_method'] = 'score_tiebreak'
+            selected_paper['debate_history'] = []
+            return selected_paper
+
         # Clear conversation context for new debate
         self.conversation_context = []
+
+        # Conduct debate on a single event loop so the network waits of the
+        # two providers overlap without thread overhead
+        debate_history, final_decision = asyncio.run(
+            self._conduct_debate(groq_top, gemini_top)
+        )
+
+        # Select the paper based on decision
+        if final_decision['selected'] == 'groq':
+            selected_paper = groq_top.copy()
+            print(f"\n🏆 Final Selection: Groq's choice")
+        else:
+            selected_paper = gemini_top.copy()
+            print(f"\n🏆 Final Selection: Gemini's choice")
         
-        # Conduct debate
-        debate_history = []
+        print(f"   Paper: {selected_paper['title']}")
+        print(f"   Reason: {final_decision['reasoning'][:200]}...")
         
-        # Round 1: Groq presents its case
-        print("\n🤖 Groq presenting case...")
-        groq_argument = self._groq_present_case(groq_top, gemini_top)
+        selected_paper['selection_method'] = 'debate'
+        selected_paper['debate_history'] = debate_history
+        selected_paper['final_decision'] = final_decision
+
+        return selected_paper
+
+    async def _create_gemini_cache(self, groq_top: Paper, gemini_top: Paper):
+        """Cache the shared debate briefing server-side so every Gemini turn
+        references it instead of re-sending the abstracts each call"""
+        briefing = f"""Debate briefing for research paper selection.
+
+Paper A (Agent A / Groq's choice):
+Title: {groq_top['title']}
+Score: {groq_top['groq_total_score']:.2f}/10
+Abstract: {groq_top['abstract']}
+
+Paper B (Agent B / Gemini's choice):
+Title: {gemini_top['title']}
+Score: {gemini_top['gemini_total_score']:.2f}/10
+Abstract: {gemini_top['abstract']}"""
+
+        system_instruction = ("You are participating in a structured debate to select "
+                              "the best research paper for a portfolio project. Adopt the "
+                              "role given at the start of each message.")
+
+        try:
+            return await self.gemini_client.aio.caches.create(
+                model=self.gemini_model,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=system_instruction,
+                    contents=[briefing],
+                    ttl="300s"
+                )
+            )
+        except Exception as e:
+            # Small briefings fall below the minimum cacheable size; just
+            # keep sending the context inline
+            print(f"   ℹ️  Gemini context cache unavailable ({str(e)[:80]}), sending context inline")
+            return None
+
+    async def _delete_gemini_cache(self) -> None:
+        if self._gemini_cache is None:
+            return
+        try:
+            await self.gemini_client.aio.caches.delete(name=self._gemini_cache.name)
+        except Exception:
+            pass
+        self._gemini_cache = None
+
+    def _gemini_config(self, system_instruction: str, **kwargs) -> Tuple[str, "types.GenerateContentConfig"]:
+        """Build a GenerateContentConfig, preferring the cached briefing
+
+        Returns a (prompt_prefix, config) pair: when the cache is active the
+        per-role instruction moves into the prompt text, since cached content
+        fixes the system instruction server-side.
+        """
+        if self._gemini_cache is not None:
+            config_obj = types.GenerateContentConfig(
+                cached_content=self._gemini_cache.name,
+                **kwargs
+            )
+            return f"{system_instruction}\n\n", config_obj
+
+        config_obj = types.GenerateContentConfig(
+            system_instruction=system_instruction,
+            **kwargs
+        )
+        return "", config_obj
+
+    async def _conduct_debate(self, groq_top: Paper, gemini_top: Paper) -> Tuple[List[Dict], Dict]:
+        """Run the three debate rounds, gathering independent turns concurrently"""
+        self._gemini_cache = await self._create_gemini_cache(groq_top, gemini_top)
+        try:
+            return await self._run_debate_rounds(groq_top, gemini_top)
+        finally:
+            await self._delete_gemini_cache()
+
+    async def _run_debate_rounds(self, groq_top: Paper, gemini_top: Paper) -> Tuple[List[Dict], Dict]:
+        debate_history = []
+
+        # Round 1: both agents present their own case concurrently —
+        # openings don't depend on the opponent's argument
+        print("\n🤖🔮 Both agents presenting cases...")
+        groq_argument, gemini_argument = await asyncio.gather(
+            self._groq_open_case(groq_top, gemini_top),
+            self._gemini_open_case(gemini_top, groq_top)
+        )
+
         self._add_to_context("Agent A (Groq)", groq_argument, 1)
+        self._add_to_context("Agent B (Gemini)", gemini_argument, 1)
         debate_history.append({
             "agent": "Groq",
             "round": 1,
             "argument": groq_argument
         })
-        print(f"   Groq: {groq_argument[:150]}...")
-        
-        # Round 2: Gemini presents its case (with context)
-        print("\n🔮 Gemini presenting case...")
-        gemini_argument = self._gemini_present_case(gemini_top, groq_top, groq_argument)
-        self._add_to_context("Agent B (Gemini)", gemini_argument, 2)
         debate_history.append({
             "agent": "Gemini",
-            "round": 2,
+            "round": 1,
             "argument": gemini_argument
         })
+        print(f"   Groq: {groq_argument[:150]}...")
         print(f"   Gemini: {gemini_argument[:150]}...")
-        
+
+        # Round 2: cross-critiques, also causally independent of each other
+        print("\n⚔️  Agents critiquing each other...")
+        self._summarize_context()
+        groq_critique, gemini_critique = await asyncio.gather(
+            self._groq_critique(groq_top, gemini_top, gemini_argument),
+            self._gemini_critique(gemini_top, groq_top, groq_argument)
+        )
+
+        self._add_to_context("Agent A (Groq)", groq_critique, 2)
+        self._add_to_context("Agent B (Gemini)", gemini_critique, 2)
+        debate_history.append({
+            "agent": "Groq",
+            "round": 2,
+            "argument": groq_critique
+        })
+        debate_history.append({
+            "agent": "Gemini",
+            "round": 2,
+            "argument": gemini_critique
+        })
+        print(f"   Groq: {groq_critique[:150]}...")
+        print(f"   Gemini: {gemini_critique[:150]}...")
+
         # Round 3: Final decision (with full context)
         print("\n⚖️  Making final decision...")
-        final_decision = self._make_final_decision(
-            groq_top, gemini_top, groq_argument, gemini_argument
+        self._summarize_context()
+        final_decision = await self._make_final_decision(
+            groq_top, gemini_top,
+            f"{groq_argument}\n\nRebuttal: {groq_critique}",
+            f"{gemini_argument}\n\nRebuttal: {gemini_critique}"
         )
-        
+
         debate_history.append({
             "agent": "Consensus",
             "round": 3,
             "decision": final_decision
         })
-        
-        # Select the paper based on decision
-        if final_decision['selected'] == 'groq':
-            selected_paper = groq_top.copy()
-            print(f"\n🏆 Final Selection: Groq's choice")
-        else:
-            selected_paper = gemini_top.copy()
-            print(f"\n🏆 Final Selection: Gemini's choice")
-        
-        print(f"   Paper: {selected_paper['title']}")
-        print(f"   Reason: {final_decision['reasoning'][:200]}...")
-        
-        selected_paper['selection_method'] = 'debate'
-        selected_paper['debate_history'] = debate_history
-        selected_paper['final_decision'] = final_decision
-        
-        return selected_paper
-    
-    def _groq_present_case(self, groq_choice: Dict, gemini_choice: Dict) -> str:
+
+        return debate_history, final_decision
+
+    async def _groq_open_case(self, groq_choice: Paper, gemini_choice: Paper) -> str:
         """Groq presents its case for its top paper"""
         prompt = f"""You are Agent A. Present a compelling argument for why your selected paper is better.
 
@@ -141,7 +302,7 @@ Gemini's Score: {gemini_choice['gemini_total_score']:.2f}/10
 Present your argument in 2-3 sentences explaining why your paper is superior for the portfolio project goal."""
         
         try:
-            response = self.groq_client.chat.completions.create(
+            response = await self.groq_async_client.chat.completions.create(
                 model=self.groq_model,
                 messages=[
                     {"role": "system", "content": """<role>
@@ -168,17 +329,111 @@ You are Agent A (Groq), a rigorous AI research analyst specializing in evaluatin
             return response.choices[0].message.content.strip()
         except Exception as e:
             return f"I believe my paper is superior due to {groq_choice['groq_scores']['reasoning']}"
-    
-    def _gemini_present_case(
+
+    async def _groq_critique(
+        self,
+        groq_choice: Paper,
+        gemini_choice: Paper,
+        gemini_argument: str
+    ) -> str:
+        """Groq rebuts Gemini's opening argument"""
+        prompt = f"""You are Agent A. Your opponent has argued for a competing paper. Rebut their argument.
+
+Opponent's Argument:
+{gemini_argument}
+
+Opponent's Choice:
+Title: {gemini_choice['title']}
+Their Score: {gemini_choice['gemini_total_score']:.2f}/10
+
+Your Choice:
+Title: {groq_choice['title']}
+Your Score: {groq_choice['groq_total_score']:.2f}/10
+Your Analysis: {groq_choice['groq_scores']['reasoning']}
+
+Present your rebuttal in 2-3 sentences, addressing the opponent's points directly and explaining why your paper remains the better choice for the portfolio project."""
+
+        try:
+            response = await self.groq_async_client.chat.completions.create(
+                model=self.groq_model,
+                messages=[
+                    {"role": "system", "content": """<role>
+You are Agent A (Groq), a rigorous AI research analyst specializing in evaluating machine learning papers for practical implementation. You are analytical, evidence-based, and persuasive.
+</role>
+
+<constraints>
+- Be precise and direct
+- Address the opponent's points explicitly
+- Present rebuttal in 2-3 sentences
+- Focus on implementation feasibility and portfolio value
+</constraints>"""},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                max_tokens=1000
+            )
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            return f"I maintain my paper is superior due to {groq_choice['groq_scores']['reasoning']}"
+
+    async def _gemini_open_case(self, gemini_choice: Paper, groq_choice: Paper) -> str:
+        """Gemini presents its case for its top paper"""
+        from google.genai import types
+
+        system_instruction = """<role>
+You are Agent B (Gemini), a research evaluation specialist with expertise in assessing papers for educational and practical value. You are thoughtful, analytical, and persuasive.
+</role>
+
+<constraints>
+- Be objective and evidence-based
+- Present argument in 2-3 sentences
+- Focus on learning value and practical impact
+</constraints>
+
+<context>
+You are engaged in a structured debate with Agent A to select the best research paper for a portfolio project.
+</context>"""
+
+        prompt = f"""<your_choice>
+Title: {gemini_choice['title']}
+Your Score: {gemini_choice['gemini_total_score']:.2f}/10
+Your Analysis: {gemini_choice['gemini_scores']['reasoning']}
+</your_choice>
+
+<opponent_choice>
+Title: {groq_choice['title']}
+Agent A's Score: {groq_choice['groq_total_score']:.2f}/10
+</opponent_choice>
+
+<task>
+Present your argument in 2-3 sentences explaining why your paper selection is superior for the portfolio project goals.
+</task>"""
+
+        try:
+            prefix, gen_config = self._gemini_config(
+                system_instruction,
+                temperature=1.0,  # Keep default temperature for Gemini 3
+                max_output_tokens=1000
+            )
+            response = await self.gemini_client.aio.models.generate_content(
+                model=self.gemini_model,
+                contents=prefix + prompt,
+                config=gen_config
+            )
+            return response.text.strip()
+        except Exception as e:
+            return f"My paper is superior because {gemini_choice['gemini_scores']['reasoning']}"
+
+    async def _gemini_critique(
         self,
-        gemini_choice: Dict,
-        groq_choice: Dict,
+        gemini_choice: Paper,
+        groq_choice: Paper,
         groq_argument: str
     ) -> str:
-        """Gemini presents its case, responding to Groq's argument"""
+        """Gemini rebuts Groq's opening argument"""
         # Import required types
         from google.genai import types
-        
+
         system_instruction = """<role>
 You are Agent B (Gemini), a research evaluation specialist with expertise in assessing papers for educational and practical value. You are thoughtful, analytical, and respond strategically to competing arguments.
 </role>
@@ -199,7 +454,7 @@ You are Agent B (Gemini), a research evaluation specialist with expertise in ass
 <context>
 You are engaged in a structured debate with Agent A to select the best research paper for a portfolio project.
 </context>"""
-        
+
         prompt = f"""<opponent_argument>
 {groq_argument}
 </opponent_argument>
@@ -217,25 +472,26 @@ Your Analysis: {gemini_choice['gemini_scores']['reasoning']}
 <task>
 Present your counter-argument in 2-3 sentences explaining why your paper selection is superior for the portfolio project goals.
 </task>"""
-        
+
         try:
-            response = self.gemini_client.models.generate_content(
+            prefix, gen_config = self._gemini_config(
+                system_instruction,
+                temperature=1.0,  # Keep default temperature for Gemini 3
+                max_output_tokens=1000
+            )
+            response = await self.gemini_client.aio.models.generate_content(
                 model=self.gemini_model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    system_instruction=system_instruction,
-                    temperature=1.0,  # Keep default temperature for Gemini 3
-                    max_output_tokens=1000
-                )
+                contents=prefix + prompt,
+                config=gen_config
             )
             return response.text.strip()
         except Exception as e:
             return f"My paper is superior because {gemini_choice['gemini_scores']['reasoning']}"
     
-    def _make_final_decision(
+    async def _make_final_decision(
         self,
-        groq_choice: Dict,
-        gemini_choice: Dict,
+        groq_choice: Paper,
+        gemini_choice: Paper,
         groq_argument: str,
         gemini_argument: str
     ) -> Dict:
@@ -299,26 +555,32 @@ Abstract: {gemini_choice['abstract'][:300]}...
 Based on the evaluation criteria, arguments, and paper details, decide which paper is better for a portfolio project. Provide your decision in the specified JSON format.
 </task>"""
         
+        # Constrain the arbiter to strict JSON so no fence-stripping is needed
+        decision_schema = {
+            "type": "object",
+            "properties": {
+                "selected": {"type": "string", "enum": ["groq", "gemini"]},
+                "reasoning": {"type": "string"},
+                "confidence": {"type": "string", "enum": ["high", "medium", "low"]}
+            },
+            "required": ["selected", "reasoning", "confidence"]
+        }
+
         try:
-            response = self.gemini_client.models.generate_content(
+            prefix, gen_config = self._gemini_config(
+                system_instruction,
+                temperature=1.0,  # Keep default for Gemini 3
+                max_output_tokens=500,
+                response_mime_type="application/json",
+                response_schema=decision_schema
+            )
+            response = await self.gemini_client.aio.models.generate_content(
                 model=self.gemini_model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    system_instruction=system_instruction,
-                    temperature=1.0,  # Keep default for Gemini 3
-                    max_output_tokens=500
-                )
+                contents=prefix + prompt,
+                config=gen_config
             )
-            
-            content = response.text
-            
-            # Extract JSON
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
-            
-            decision = json.loads(content)
+
+            decision = extract_json(response.text)
             return decision
             
         except Exception as e:
@@ -1,6 +1,12 @@
+import json
+import os
+import time
+
 import arxiv
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
 from datetime import datetime, timedelta, timezone
+from helper.paper import Paper
 import config
 
 
@@ -10,55 +16,101 @@ class ArxivFetcher:
         self.max_papers_per_category = config.MAX_PAPERS_PER_CATEGORY
         self.total_papers = config.TOTAL_PAPERS_TO_FETCH
         self.days_limit = 7
+        self.cache_dir = os.path.join(config.OUTPUT_DIR, "arxiv_cache")
+        self.cache_ttl = config.ARXIV_CACHE_TTL_SECONDS
 
-    def fetch_papers(self) -> List[Dict]:
-        print("📚 Fetching papers from arXiv (last 7 days only)...")
-        all_papers = []
-        # Make cutoff_date timezone-aware to match arxiv result.published
-        cutoff_date = datetime.now(timezone.utc) - timedelta(days=self.days_limit)
+    def _cache_path(self, category: str) -> str:
+        return os.path.join(self.cache_dir, f"{category.replace('.', '_')}.json")
 
-        for category in self.categories:
-            print(f"  → Fetching from category: {category}")
+    def _load_cached_category(self, category: str) -> Optional[List[Paper]]:
+        """Return cached papers for a category, or None if missing/expired"""
+        cache_path = self._cache_path(category)
+        try:
+            if time.time() - os.path.getmtime(cache_path) > self.cache_ttl:
+                return None
+            with open(cache_path, "r", encoding="utf-8") as f:
+                return [Paper.from_dict(entry) for entry in json.load(f)]
+        except (OSError, json.JSONDecodeError, TypeError):
+            return None
 
-            search = arxiv.Search(
-                query=f"cat:{category}",
-                max_results=self.max_papers_per_category,
-                sort_by=arxiv.SortCriterion.SubmittedDate,
-                sort_order=arxiv.SortOrder.Descending
-            )
+    def _save_category_cache(self, category: str, papers: List[Paper]) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._cache_path(category), "w", encoding="utf-8") as f:
+            json.dump([paper.to_dict() for paper in papers], f)
 
-            for result in search.results():
-                if result.published < cutoff_date:
-                    break
+    def _fetch_category(self, category: str, cutoff_date: datetime) -> List[Paper]:
+        """Fetch up to max_papers_per_category recent papers for one category"""
+        # Skip the network round-trip entirely when a fresh cache exists
+        cached = self._load_cached_category(category)
+        if cached is not None:
+            print(f"  ✓ Using cached results for category: {category}")
+            return cached
 
-                paper = {
-                    "title": result.title,
-                    "abstract": result.summary.replace("\n", " "),
-                    "authors": [author.name for author in result.authors],
-                    "pdf_url": result.pdf_url,
-                    "arxiv_id": result.entry_id.split("/")[-1],
-                    "published": result.published.strftime("%Y-%m-%d"),
-                    "category": category,
-                    "primary_category": result.primary_category
-                }
+        print(f"  → Fetching from category: {category}")
 
-                all_papers.append(paper)
+        search = arxiv.Search(
+            query=f"cat:{category}",
+            max_results=self.max_papers_per_category,
+            sort_by=arxiv.SortCriterion.SubmittedDate,
+            sort_order=arxiv.SortOrder.Descending
+        )
+
+        # Explicit client: small page size and a short delay instead of the
+        # deprecated search.results() defaults (page_size=100, 3s delay).
+        # One client per call since categories are fetched from worker threads.
+        client = arxiv.Client(
+            page_size=max(self.max_papers_per_category, 10),
+            delay_seconds=0.5,
+            num_retries=3
+        )
+
+        category_papers = []
+        for result in client.results(search):
+            if result.published < cutoff_date:
+                break
+
+            paper = Paper(
+                title=result.title,
+                abstract=result.summary.replace("\n", " "),
+                authors=[author.name for author in result.authors],
+                pdf_url=result.pdf_url,
+                arxiv_id=result.entry_id.split("/")[-1],
+                published=result.published.strftime("%Y-%m-%d"),
+                category=category,
+                primary_category=result.primary_category
+            )
 
-                if len(all_papers) >= self.total_papers:
-                    break
+            category_papers.append(paper)
 
-            if len(all_papers) >= self.total_papers:
+            if len(category_papers) >= self.max_papers_per_category:
                 break
 
+        # Paper records serialize to JSON-safe dicts for the cache
+        self._save_category_cache(category, category_papers)
+        return category_papers
+
+    def fetch_papers(self) -> List[Paper]:
+        print("📚 Fetching papers from arXiv (last 7 days only)...")
+        # Make cutoff_date timezone-aware to match arxiv result.published
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=self.days_limit)
+
+        # Categories are independent queries, so fetch them all concurrently;
+        # latency becomes max(per-category time) instead of the sum
+        with ThreadPoolExecutor(max_workers=len(self.categories)) as executor:
+            results = list(executor.map(
+                lambda category: self._fetch_category(category, cutoff_date),
+                self.categories
+            ))
+
+        all_papers = [paper for category_papers in results for paper in category_papers]
+
         papers = all_papers[:self.total_papers]
         print(f"✅ Fetched {len(papers)} papers from last week")
         return papers
 
-    def split_papers(self, papers: List[Dict]) -> tuple[List[Dict], List[Dict]]:
+    def split_papers(self, papers: List[Paper]) -> tuple[List[Paper], List[Paper]]:
         mid = len(papers) // 2
         groq_papers = papers[:mid]
         gemini_papers = papers[mid:]
         print(f"📊 Split papers: {len(groq_papers)} for Groq, {len(gemini_papers)} for Gemini")
         return groq_papers, gemini_papers
-
-
@@ -1,17 +1,70 @@
+import functools
 import requests
 import json
-from typing import Dict
+from requests.adapters import HTTPAdapter
+from typing import Dict, List
 from datetime import datetime
+from urllib3.util.retry import Retry
 import config
 
+# Discord allows up to 1024 chars per embed field value
+def _truncate_field(text: str) -> str:
+    return text if len(text) <= 1024 else text[:1021] + "..."
+
+
+# Discord also caps the whole embed at 6000 chars; stay a bit under it
+EMBED_CHAR_BUDGET = 5800
+
+
+@functools.lru_cache(maxsize=64)
+def _format_technique_list(techniques: tuple) -> str:
+    formatted = "\n".join([f"• {t}" for t in techniques[:5]])
+    if len(formatted) > 1024:
+        formatted = formatted[:1020] + "..."
+    return formatted
+
+
+# Embed color per arXiv category
+CATEGORY_COLORS = {
+    "cs.CV": 0x3498db,  # Blue for Computer Vision
+    "cs.CL": 0x2ecc71,  # Green for NLP
+    "cs.LG": 0x9b59b6,  # Purple for ML
+    "q-bio.QM": 0xe74c3c,  # Red for Healthcare
+}
+DEFAULT_COLOR = 0x95a5a6
+
 
 class DiscordNotifier:
     """Send notifications to Discord"""
-    
+
     def __init__(self):
         self.webhook_url = config.DISCORD_WEBHOOK_URL
         self.username = config.DISCORD_USERNAME
         self.enabled = config.DISCORD_ENABLED and bool(self.webhook_url)
+
+        # Reuse one pooled session so follow-up notifications skip the
+        # TCP + TLS handshake, and retry transient webhook failures
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504]
+            )
+        )
+        self._session.mount("https://", adapter)
+
+    def close(self) -> None:
+        """Release pooled connections"""
+        self._session.close()
+
+    def __del__(self):
+        try:
+            self._session.close()
+        except Exception:
+            pass
     
     def send_report(self, report: Dict) -> bool:
      
@@ -31,7 +84,7 @@ class DiscordNotifier:
                 "embeds": [embed]
             }
             
-            response = requests.post(
+            response = self._session.post(
                 self.webhook_url,
                 json=payload,
                 headers={"Content-Type": "application/json"},
@@ -48,43 +101,34 @@ class DiscordNotifier:
             return False
     
     def _create_embed(self, report: Dict) -> Dict:
-     
-        # Truncate text if too long (Discord has character limits)
-        def truncate(text: str, max_length: int = 1024) -> str:
-            if len(text) <= max_length:
-                return text
-            return text[:max_length-3] + "..."
-        
-        # Color based on category
-        color_map = {
-            "cs.CV": 0x3498db,  # Blue for Computer Vision
-            "cs.CL": 0x2ecc71,  # Green for NLP
-            "cs.LG": 0x9b59b6,  # Purple for ML
-            "q-bio.QM": 0xe74c3c,  # Red for Healthcare
-        }
-        color = color_map.get(report.get('category', ''), 0x95a5a6)
-        
+
+        color = CATEGORY_COLORS.get(report.get('category', ''), DEFAULT_COLOR)
+
+        authors = ', '.join(report['paper_authors'][:3])
+        if len(report['paper_authors']) > 3:
+            authors += '...'
+
         embed = {
             "title": f"📄 {report['paper_title'][:200]}",
             "url": report['pdf_url'],
-            "description": f"**Authors:** {', '.join(report['paper_authors'][:3])}{'...' if len(report['paper_authors']) > 3 else ''}\n"
+            "description": f"**Authors:** {authors}\n"
                           f"**Published:** {report['published']} | **Category:** {report['category']}\n"
                           f"**arXiv ID:** [{report['arxiv_id']}](https://arxiv.org/abs/{report['arxiv_id']})",
             "color": color,
             "fields": [
                 {
                     "name": "🎯 Problem",
-                    "value": truncate(report['Problem'], 1024),
+                    "value": _truncate_field(report['Problem']),
                     "inline": False
                 },
                 {
                     "name": "📊 Dataset",
-                    "value": truncate(report['Dataset'], 1024),
+                    "value": _truncate_field(report['Dataset']),
                     "inline": False
                 },
                 {
                     "name": "🤖 Model & Methodology",
-                    "value": truncate(report['Model'], 1024),
+                    "value": _truncate_field(report['Model']),
                     "inline": False
                 },
                 {
@@ -94,12 +138,12 @@ class DiscordNotifier:
                 },
                 {
                     "name": "💡 Why It Matters",
-                    "value": truncate(report['WhyItMatters'], 1024),
+                    "value": _truncate_field(report['WhyItMatters']),
                     "inline": False
                 },
                 {
                     "name": "🚀 Mini-Project Idea",
-                    "value": truncate(report['MiniImplementationIdea'], 1024),
+                    "value": _truncate_field(report['MiniImplementationIdea']),
                     "inline": False
                 }
             ],
@@ -107,17 +151,66 @@ class DiscordNotifier:
                 "text": f"ProtoML • {datetime.now().strftime('%Y-%m-%d %H:%M')}"
             }
         }
-        
-        
+
+        self._fit_embed_budget(embed)
         return embed
+
+    def _fit_embed_budget(self, embed: Dict) -> None:
+        """Keep the total embed size under Discord's 6000-char limit
+
+        Measure once; most embeds are already short enough and skip the
+        loop. Oversized ones get their largest field halved until the
+        total fits, instead of being silently rejected by Discord.
+        """
+        fixed = len(embed["title"]) + len(embed["description"]) + len(embed["footer"]["text"])
+        fixed += sum(len(field["name"]) for field in embed["fields"])
+        total = fixed + sum(len(field["value"]) for field in embed["fields"])
+
+        while total > EMBED_CHAR_BUDGET:
+            largest = max(embed["fields"], key=lambda field: len(field["value"]))
+            if len(largest["value"]) <= 64:
+                break
+            trimmed = largest["value"][:len(largest["value"]) // 2 - 3] + "..."
+            total -= len(largest["value"]) - len(trimmed)
+            largest["value"] = trimmed
     
+    def send_reports(self, reports: List[Dict]) -> bool:
+        """Send several reports, grouping up to 10 embeds per webhook POST"""
+        if not self.enabled:
+            print("⚠️  Discord notifications disabled or webhook URL not set")
+            return False
+
+        embeds = [self._create_embed(report) for report in reports]
+
+        success = True
+        for start in range(0, len(embeds), 10):
+            payload = {
+                "username": self.username,
+                "embeds": embeds[start:start + 10]
+            }
+            try:
+                response = self._session.post(
+                    self.webhook_url,
+                    json=payload,
+                    headers={"Content-Type": "application/json"},
+                    timeout=10
+                )
+                response.raise_for_status()
+            except Exception as e:
+                print(f"❌ Error sending to Discord: {str(e)}")
+                success = False
+
+        return success
+
     def _format_techniques(self, techniques) -> str:
         """Format key techniques for Discord"""
         if isinstance(techniques, list):
-            formatted = "\n".join([f"• {t}" for t in techniques[:5]])
-            if len(formatted) > 1024:
-                formatted = formatted[:1020] + "..."
-            return formatted
+            # Reports repeat across send_report/send_reports, so memoize
+            # the formatted bullet list keyed on the (hashable) tuple
+            try:
+                return _format_technique_list(tuple(techniques))
+            except TypeError:
+                return _format_technique_list(tuple(str(t) for t in techniques))
         else:
             return str(techniques)[:1024]
     
@@ -132,7 +225,7 @@ class DiscordNotifier:
                 "content": message
             }
             
-            response = requests.post(
+            response = self._session.post(
                 self.webhook_url,
                 json=payload,
                 headers={"Content-Type": "application/json"},
@@ -0,0 +1,75 @@
+"""
+JSON Extraction Utilities
+Robust parsing of JSON payloads out of LLM completions
+"""
+
+import json
+import re
+from typing import Any, Optional
+
+# Fenced ```json ... ``` (or bare ```) block wrapping an object/array
+JSON_FENCE = re.compile(r"```(?:json)?\s*([\[{].*?[\]}])\s*```", re.DOTALL)
+
+
+def _balanced_json_span(text: str) -> Optional[str]:
+    """Return the first balanced {...} or [...] span in text, if any"""
+    start = -1
+    for i, ch in enumerate(text):
+        if ch in "{[":
+            start = i
+            break
+    if start == -1:
+        return None
+
+    openers = {"{": "}", "[": "]"}
+    closer = openers[text[start]]
+    opener = text[start]
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == opener:
+            depth += 1
+        elif ch == closer:
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+def extract_json(text: str) -> Any:
+    """Parse the first JSON object/array found in an LLM response
+
+    Tries, in order: the whole (stripped) text, a fenced ```json``` block,
+    and finally a balanced-brace scan. Raises ValueError if nothing parses.
+    """
+    text = text.strip()
+
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    match = JSON_FENCE.search(text)
+    if match:
+        try:
+            return json.loads(match.group(1))
+        except json.JSONDecodeError:
+            pass
+
+    span = _balanced_json_span(text)
+    if span is not None:
+        return json.loads(span)
+
+    raise ValueError(f"No JSON payload found in response: {text[:200]}")
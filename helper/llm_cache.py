@@ -0,0 +1,64 @@
+"""
+LLM Response Cache
+SQLite-backed cache for near-deterministic LLM calls, keyed by a hash of
+model + prompt + sampling parameters
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+import config
+
+
+class LLMCache:
+    """Persistent key/value cache for LLM completions with TTL expiry"""
+
+    def __init__(self, db_path: str = None, ttl_seconds: int = None):
+        self.db_path = db_path or os.path.join(config.OUTPUT_DIR, "llm_cache.sqlite")
+        self.ttl_seconds = ttl_seconds or config.LLM_CACHE_TTL_SECONDS
+        self._lock = threading.Lock()
+
+        # check_same_thread=False so the cache can be shared across the
+        # scoring thread pool; all access is serialized by _lock
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, value TEXT, created_at INT)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, prompt: str, temperature: float, max_tokens: int) -> str:
+        """Content-addressable key: same inputs always map to the same entry"""
+        raw = f"{model}|{prompt}|{temperature}|{max_tokens}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached completion, or None on miss or expiry"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            value, created_at = row
+            if time.time() - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, int(time.time()))
+            )
+            self._conn.commit()
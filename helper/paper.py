@@ -0,0 +1,66 @@
+"""
+Paper Record
+Slot-based record for fetched papers, with dict-style access kept for
+compatibility with existing call sites
+"""
+
+import dataclasses
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+
+@dataclass(slots=True)
+class Paper:
+    """A fetched arXiv paper plus per-agent scores and selection metadata
+
+    Slots keep the per-paper footprint roughly half of an equivalent dict
+    and make copies cheap. Dict-style access (paper['title'], paper.get,
+    'selection_method' in paper) still works so call sites read the same
+    as before; optional fields count as "present" once set to a value.
+    """
+    title: str
+    abstract: str
+    authors: List[str]
+    pdf_url: str
+    arxiv_id: str
+    published: str
+    category: str
+    primary_category: str
+    groq_scores: Optional[Dict] = None
+    groq_total_score: float = 0.0
+    gemini_scores: Optional[Dict] = None
+    gemini_total_score: float = 0.0
+    selection_method: Optional[str] = None
+    debate_history: Optional[List[Dict]] = None
+    final_decision: Optional[Dict] = None
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in _FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in _FIELDS and getattr(self, key) is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None) if key in _FIELDS else None
+        return value if value is not None else default
+
+    def copy(self) -> "Paper":
+        return dataclasses.replace(self)
+
+    def to_dict(self) -> Dict:
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Paper":
+        return cls(**{k: v for k, v in data.items() if k in _FIELDS})
+
+
+_FIELDS = frozenset(f.name for f in dataclasses.fields(Paper))
@@ -1,7 +1,13 @@
+import asyncio
 import json
-from typing import List, Dict
-from groq import Groq
+from typing import List, Dict, Tuple
+
+import numpy as np
+from groq import AsyncGroq, Groq
 from google import genai
+from helper.llm_cache import LLMCache
+from helper.paper import Paper
+from helper.rate_limiter import RateLimiter
 import config
 
 
@@ -10,6 +16,7 @@ class PaperScorer:
     def __init__(self):
         # Initialize Groq
         self.groq_client = Groq(api_key=config.GROQ_API_KEY)
+        self.groq_async_client = AsyncGroq(api_key=config.GROQ_API_KEY)
         self.groq_model = config.GROQ_MODEL
         
         # Initialize Gemini with new API
@@ -17,8 +24,48 @@ class PaperScorer:
         self.gemini_model = config.GEMINI_MODEL
         
         self.scoring_weights = config.SCORING_WEIGHTS
+
+        # Fixed criteria order + weight vector for vectorized scoring
+        self.criteria = list(self.scoring_weights.keys())
+        self.weights_vec = np.array([self.scoring_weights[c] for c in self.criteria])
+
+        # Throttle parallel scoring below provider rate limits so we never
+        # hit 429 backoff windows
+        self.groq_limiter = RateLimiter(config.GROQ_RPM, config.GROQ_TPM)
+        self.gemini_limiter = RateLimiter(config.GEMINI_RPM, config.GEMINI_TPM)
+
+        # Scoring runs at low temperature, so identical papers can reuse
+        # cached completions across reruns instead of paying API latency
+        self.llm_cache = LLMCache()
+
+        # Schema for Gemini structured output
+        self.gemini_response_schema = {
+            "type": "object",
+            "properties": {
+                "problem_relevance": {"type": "integer"},
+                "dataset_quality": {"type": "integer"},
+                "model_novelty": {"type": "integer"},
+                "real_world_impact": {"type": "integer"},
+                "reasoning": {"type": "string"},
+                "overall_impression": {"type": "string"}
+            },
+            "required": ["problem_relevance", "dataset_quality", "model_novelty", "real_world_impact", "reasoning", "overall_impression"]
+        }
+
+        # Batch variant: array of score objects tagged with the paper index
+        self.gemini_batch_schema = {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "index": {"type": "integer"},
+                    **self.gemini_response_schema["properties"]
+                },
+                "required": ["index"] + self.gemini_response_schema["required"]
+            }
+        }
     
-    def _create_scoring_prompt(self, paper: Dict, agent_name: str) -> str:
+    def _create_scoring_prompt(self, paper: Paper, agent_name: str) -> str:
         prompt = f"""You are {agent_name}, an expert AI research analyst. Score this research paper on the following criteria (scale 1-10):
 
 1. Problem Relevance: How important is the problem being addressed?
@@ -43,148 +90,279 @@ Provide your analysis in JSON format:
 }}
 
 Be critical and discerning in your evaluation."""
-        
+
         return prompt
-    
-    def score_with_groq(self, papers: List[Dict]) -> List[Dict]:
-       
-        print(f"\n🤖 Groq scoring {len(papers)} papers...")
+
+    def _create_batch_scoring_prompt(self, papers: List[Paper], agent_name: str) -> str:
+        """Marshal several papers into one prompt asking for an array of scores"""
+        entries = []
+        for idx, paper in enumerate(papers):
+            entries.append(
+                f"Paper {idx}:\n"
+                f"Title: {paper['title']}\n"
+                f"Category: {paper['primary_category']}\n"
+                f"Abstract:\n{paper['abstract']}"
+            )
+        papers_block = "\n\n".join(entries)
+
+        prompt = f"""You are {agent_name}, an expert AI research analyst. Score each of the following {len(papers)} research papers on the following criteria (scale 1-10):
+
+1. Problem Relevance: How important is the problem being addressed?
+2. Dataset Quality: Quality and scale of datasets used
+3. Model Novelty: Innovation in the approach/architecture
+4. Real-world Impact: Practical applicability and potential impact
+
+{papers_block}
+
+Return a JSON array with exactly {len(papers)} objects, one per paper, in this format:
+[
+    {{
+        "index": <paper index>,
+        "problem_relevance": <score 1-10>,
+        "dataset_quality": <score 1-10>,
+        "model_novelty": <score 1-10>,
+        "real_world_impact": <score 1-10>,
+        "reasoning": "<brief explanation of your scores>",
+        "overall_impression": "<1-2 sentence summary>"
+    }}
+]
+
+Be critical and discerning in your evaluation."""
+
+        return prompt
+
+    def _weighted_scores(self, score_dicts: List[Dict]) -> np.ndarray:
+        """Compute all weighted totals in one (N, criteria) @ (criteria,) matmul"""
+        score_matrix = np.array(
+            [[scores[criterion] for criterion in self.criteria] for scores in score_dicts],
+            dtype=np.float64
+        )
+        return score_matrix @ self.weights_vec
+
+    def _merge_batch_scores(self, papers: List[Paper], results: List[Dict], agent: str) -> List[Paper]:
+        """Match batch score objects back to papers by index and apply weights"""
+        by_index = {int(entry['index']): entry for entry in results}
+
+        score_dicts = [
+            {k: v for k, v in by_index[idx].items() if k != 'index'}
+            for idx in range(len(papers))
+        ]
+        weighted = self._weighted_scores(score_dicts)
+
         scored_papers = []
-        
-        for i, paper in enumerate(papers, 1):
-            print(f"  → Scoring paper {i}/{len(papers)}: {paper['title'][:60]}...")
-            
-            prompt = self._create_scoring_prompt(paper, "Agent A")
-            
-            try:
-                response = self.groq_client.chat.completions.create(
+        for paper, scores, weighted_score in zip(papers, score_dicts, weighted):
+            paper_with_score = paper.copy()
+            paper_with_score[f'{agent}_scores'] = scores
+            paper_with_score[f'{agent}_total_score'] = float(weighted_score)
+            scored_papers.append(paper_with_score)
+
+        return scored_papers
+
+    async def _score_batch_groq(self, papers: List[Paper]) -> List[Paper]:
+        """Score a batch of papers in a single Groq request"""
+        prompt = self._create_batch_scoring_prompt(papers, "Agent A")
+
+        cache_key = LLMCache.make_key(self.groq_model, prompt, 0.0, 4000)
+        content = self.llm_cache.get(cache_key)
+        cached = content is not None
+
+        if not cached:
+            await self.groq_limiter.acquire_async(RateLimiter.estimate_tokens(prompt, 4000))
+            response = await self.groq_async_client.chat.completions.create(
+                model=self.groq_model,
+                messages=[
+                    {"role": "system", "content": "You are an expert AI research analyst. Provide scores in valid JSON format."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.0,
+                max_tokens=4000,
+                response_format={"type": "json_object"}
+            )
+            content = response.choices[0].message.content
+
+        results = json.loads(content)
+        if isinstance(results, dict):
+            # json_object mode may wrap the array in an enclosing object
+            results = next(v for v in results.values() if isinstance(v, list))
+
+        # Persist only after the reply parsed; a malformed response must
+        # not be served from cache for the whole TTL
+        if not cached:
+            self.llm_cache.set(cache_key, content)
+        return self._merge_batch_scores(papers, results, 'groq')
+
+    async def _score_batch_gemini(self, papers: List[Paper]) -> List[Paper]:
+        """Score a batch of papers in a single Gemini request"""
+        prompt = self._create_batch_scoring_prompt(papers, "Agent B")
+
+        cache_key = LLMCache.make_key(self.gemini_model, prompt, 0.0, 8192)
+        content = self.llm_cache.get(cache_key)
+        cached = content is not None
+
+        if not cached:
+            await self.gemini_limiter.acquire_async(RateLimiter.estimate_tokens(prompt, 8192))
+            response = await self.gemini_client.aio.models.generate_content(
+                model=self.gemini_model,
+                contents=prompt,
+                config={
+                    "temperature": 0.0,
+                    "max_output_tokens": 8192,
+                    "response_mime_type": "application/json",
+                    "response_schema": self.gemini_batch_schema
+                }
+            )
+            content = response.text.strip()
+
+        results = json.loads(content)
+        if not cached:
+            self.llm_cache.set(cache_key, content)
+        return self._merge_batch_scores(papers, results, 'gemini')
+
+    def _default_scored_paper(self, paper: Paper, agent: str, error: Exception) -> Paper:
+        """Return paper with neutral default scores when an agent fails"""
+        paper_with_score = paper.copy()
+        paper_with_score[f'{agent}_scores'] = {
+            "problem_relevance": 5,
+            "dataset_quality": 5,
+            "model_novelty": 5,
+            "real_world_impact": 5,
+            "reasoning": f"Error during scoring: {str(error)}",
+            "overall_impression": "Unable to score"
+        }
+        paper_with_score[f'{agent}_total_score'] = 5.0
+        return paper_with_score
+
+    async def _score_one_groq(self, paper: Paper) -> Paper:
+        """Score a single paper with Groq, returning defaults on error"""
+        prompt = self._create_scoring_prompt(paper, "Agent A")
+
+        try:
+            cache_key = LLMCache.make_key(self.groq_model, prompt, 0.0, 1000)
+            content = self.llm_cache.get(cache_key)
+            cached = content is not None
+
+            if not cached:
+                await self.groq_limiter.acquire_async(RateLimiter.estimate_tokens(prompt, 1000))
+                response = await self.groq_async_client.chat.completions.create(
                     model=self.groq_model,
                     messages=[
                         {"role": "system", "content": "You are an expert AI research analyst. Provide scores in valid JSON format."},
                         {"role": "user", "content": prompt}
                     ],
-                    temperature=0.3,
-                    max_tokens=1000
+                    temperature=0.0,
+                    max_tokens=1000,
+                    response_format={"type": "json_object"}
                 )
-                
-                # Parse response
                 content = response.choices[0].message.content
-                
-                # Extract JSON from response
-                if "```json" in content:
-                    content = content.split("```json")[1].split("```")[0].strip()
-                elif "```" in content:
-                    content = content.split("```")[1].split("```")[0].strip()
-                
-                scores = json.loads(content)
-                
-                # Calculate weighted score
-                weighted_score = sum(
-                    scores[criterion] * weight
-                    for criterion, weight in self.scoring_weights.items()
+
+            scores = json.loads(content)
+            if not cached:
+                self.llm_cache.set(cache_key, content)
+
+            # Calculate weighted score
+            weighted_score = float(self._weighted_scores([scores])[0])
+
+            paper_with_score = paper.copy()
+            paper_with_score['groq_scores'] = scores
+            paper_with_score['groq_total_score'] = weighted_score
+            return paper_with_score
+
+        except Exception as e:
+            print(f"    ⚠️  Error scoring '{paper['title'][:60]}': {str(e)}")
+            return self._default_scored_paper(paper, 'groq', e)
+
+    async def _score_one_gemini(self, paper: Paper) -> Paper:
+        """Score a single paper with Gemini, returning defaults on error"""
+        prompt = self._create_scoring_prompt(paper, "Agent B")
+
+        try:
+            cache_key = LLMCache.make_key(self.gemini_model, prompt, 0.0, 2048)
+            content = self.llm_cache.get(cache_key)
+            cached = content is not None
+
+            if not cached:
+                await self.gemini_limiter.acquire_async(RateLimiter.estimate_tokens(prompt, 2048))
+                response = await self.gemini_client.aio.models.generate_content(
+                    model=self.gemini_model,
+                    contents=prompt,
+                    config={
+                        "temperature": 0.0,
+                        "max_output_tokens": 2048,
+                        "response_mime_type": "application/json",
+                        "response_schema": self.gemini_response_schema
+                    }
                 )
-                
-                paper_with_score = paper.copy()
-                paper_with_score['groq_scores'] = scores
-                paper_with_score['groq_total_score'] = weighted_score
-                
-                scored_papers.append(paper_with_score)
-                
+                content = response.text.strip()
+
+            try:
+                scores = json.loads(content)
+            except json.JSONDecodeError:
+                # If still failing, log the content for debugging
+                print(f"    ⚠️  JSON parse error. Content: {content[:200]}")
+                raise
+
+            if not cached:
+                self.llm_cache.set(cache_key, content)
+
+            weighted_score = float(self._weighted_scores([scores])[0])
+
+            paper_with_score = paper.copy()
+            paper_with_score['gemini_scores'] = scores
+            paper_with_score['gemini_total_score'] = weighted_score
+            return paper_with_score
+
+        except Exception as e:
+            print(f"    ⚠️  Error scoring '{paper['title'][:60]}': {str(e)}")
+            return self._default_scored_paper(paper, 'gemini', e)
+
+    async def score_with_groq(self, papers: List[Paper]) -> List[Paper]:
+        # Marshal papers into batched requests (one round-trip per batch);
+        # on a bad batch response, fall back to concurrent per-paper scoring
+        print(f"\n🤖 Groq scoring {len(papers)} papers...")
+
+        scored_papers = []
+        for start in range(0, len(papers), config.MAX_SCORING_BATCH):
+            batch = papers[start:start + config.MAX_SCORING_BATCH]
+            try:
+                scored_papers.extend(await self._score_batch_groq(batch))
             except Exception as e:
-                print(f"    ⚠️  Error scoring paper: {str(e)}")
-                # Add default scores on error
-                paper_with_score = paper.copy()
-                paper_with_score['groq_scores'] = {
-                    "problem_relevance": 5,
-                    "dataset_quality": 5,
-                    "model_novelty": 5,
-                    "real_world_impact": 5,
-                    "reasoning": f"Error during scoring: {str(e)}",
-                    "overall_impression": "Unable to score"
-                }
-                paper_with_score['groq_total_score'] = 5.0
-                scored_papers.append(paper_with_score)
-        
+                print(f"  ⚠️  Batch scoring failed ({str(e)}), retrying per paper...")
+                scored_papers.extend(
+                    await asyncio.gather(*(self._score_one_groq(p) for p in batch))
+                )
+
         # Sort by score
         scored_papers.sort(key=lambda x: x['groq_total_score'], reverse=True)
-        
+
         print(f"✅ Groq scoring complete")
         return scored_papers
-    
-    def score_with_gemini(self, papers: List[Dict]) -> List[Dict]:
+
+    async def score_with_gemini(self, papers: List[Paper]) -> List[Paper]:
         print(f"\n🔮 Gemini scoring {len(papers)} papers...")
+
         scored_papers = []
-        
-        
-        response_schema = {
-            "type": "object",
-            "properties": {
-                "problem_relevance": {"type": "integer"},
-                "dataset_quality": {"type": "integer"},
-                "model_novelty": {"type": "integer"},
-                "real_world_impact": {"type": "integer"},
-                "reasoning": {"type": "string"},
-                "overall_impression": {"type": "string"}
-            },
-            "required": ["problem_relevance", "dataset_quality", "model_novelty", "real_world_impact", "reasoning", "overall_impression"]
-        }
-        
-        for i, paper in enumerate(papers, 1):
-            print(f"  → Scoring paper {i}/{len(papers)}: {paper['title'][:60]}...")
-            
-            prompt = self._create_scoring_prompt(paper, "Agent B")
-            
+        for start in range(0, len(papers), config.MAX_SCORING_BATCH):
+            batch = papers[start:start + config.MAX_SCORING_BATCH]
             try:
-                response = self.gemini_client.models.generate_content(
-                    model=self.gemini_model,
-                    contents=prompt,
-                    config={
-                        "temperature": 0.3,
-                        "max_output_tokens": 2048,
-                        "response_mime_type": "application/json",
-                        "response_schema": response_schema
-                    }
+                scored_papers.extend(await self._score_batch_gemini(batch))
+            except Exception as e:
+                print(f"  ⚠️  Batch scoring failed ({str(e)}), retrying per paper...")
+                scored_papers.extend(
+                    await asyncio.gather(*(self._score_one_gemini(p) for p in batch))
                 )
-                
 
-                content = response.text.strip()
-               
-
-                try:
-                    scores = json.loads(content)
-                except json.JSONDecodeError as json_err:
-                    # If still failing, log the content for debugging
-                    print(f"    ⚠️  JSON parse error. Content: {content[:200]}")
-                    raise
-                
-               
-                weighted_score = sum(
-                    scores[criterion] * weight
-                    for criterion, weight in self.scoring_weights.items()
-                )
-                
-                paper_with_score = paper.copy()
-                paper_with_score['gemini_scores'] = scores
-                paper_with_score['gemini_total_score'] = weighted_score
-                
-                scored_papers.append(paper_with_score)
-                
-            except Exception as e:
-                print(f"    ⚠️  Error scoring paper: {str(e)}")
-             
-                paper_with_score = paper.copy()
-                paper_with_score['gemini_scores'] = {
-                    "problem_relevance": 5,
-                    "dataset_quality": 5,
-                    "model_novelty": 5,
-                    "real_world_impact": 5,
-                    "reasoning": f"Error during scoring: {str(e)}",
-                    "overall_impression": "Unable to score"
-                }
-                paper_with_score['gemini_total_score'] = 5.0
-                scored_papers.append(paper_with_score)
-        
         scored_papers.sort(key=lambda x: x['gemini_total_score'], reverse=True)
-        
+
         print(f"✅ Gemini scoring complete")
         return scored_papers
+
+    def score_papers(self, groq_papers: List[Paper], gemini_papers: List[Paper]) -> Tuple[List[Paper], List[Paper]]:
+        """Synchronous entry point: score both halves concurrently on one event loop"""
+        async def _score_both():
+            return await asyncio.gather(
+                self.score_with_groq(groq_papers),
+                self.score_with_gemini(gemini_papers)
+            )
+
+        groq_scored, gemini_scored = asyncio.run(_score_both())
+        return groq_scored, gemini_scored
@@ -3,15 +3,81 @@ PDF Processor with Embeddings
 Downloads, parses PDFs, and generates embeddings for semantic search
 """
 
+import functools
+import json
 import os
+
+# Must be set before torch/MKL initialize their thread pools
+os.environ.setdefault("OMP_NUM_THREADS", str(os.cpu_count()))
+os.environ.setdefault("MKL_NUM_THREADS", str(os.cpu_count()))
+
 import requests
-import fitz  # PyMuPDF
 import numpy as np
-from typing import List, Dict, Tuple
-from sentence_transformers import SentenceTransformer
-import torch
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Optional, Tuple
+from urllib3.util.retry import Retry
+from helper.paper import Paper
 import config
 
+# torch, sentence_transformers and fitz are imported lazily at first
+# use; they dominate cold-start time and aren't needed when the
+# pipeline exits early
+
+# Papers below this page count are chunked serially; pool startup would
+# cost more than it saves
+MIN_PAGES_FOR_PROCESS_POOL = 10
+
+# Skip pathologically large PDFs outright
+MAX_PDF_BYTES = 100 * 1024 * 1024
+
+
+def _chunk_page_text(text: str, page_num: int, chunk_size: int) -> List[Dict]:
+    """Split one page's text into chunk dicts (chunk_id assigned later)"""
+    # Compute chunk boundaries in one vectorized pass over word
+    # lengths instead of a per-word Python loop
+    words = text.split()
+    if not words:
+        return []
+
+    lengths = np.fromiter(
+        (len(word) + 1 for word in words),  # +1 for space
+        dtype=np.int32,
+        count=len(words)
+    )
+    cum = np.cumsum(lengths)
+    targets = np.arange(chunk_size, cum[-1] + chunk_size, chunk_size)
+    # A single over-long word (URL, equation) spans several targets and
+    # yields duplicate boundaries; unique keeps them strictly increasing
+    # so the rest of the page still gets chunked
+    boundaries = np.unique(np.minimum(
+        np.searchsorted(cum, targets, side='left') + 1,
+        len(words)
+    ))
+
+    chunks = []
+    prev = 0
+    for boundary in boundaries:
+        chunks.append({
+            'text': ' '.join(words[prev:boundary]),
+            'page': page_num + 1
+        })
+        prev = int(boundary)
+    return chunks
+
+
+def _extract_page_chunks(pdf_path: str, page_num: int, chunk_size: int) -> List[Dict]:
+    """Worker: open the PDF in this process and chunk a single page"""
+    import fitz
+
+    doc = fitz.open(pdf_path)
+    try:
+        # sort=True gives consistent reading order for multi-column pages
+        return _chunk_page_text(doc[page_num].get_text("text", sort=True), page_num, chunk_size)
+    finally:
+        doc.close()
+
 
 class PDFProcessor:
     """Process PDF papers and generate embeddings"""
@@ -20,13 +86,82 @@ class PDFProcessor:
         self.cache_dir = config.PDF_CACHE_DIR
         self.embeddings_dir = config.EMBEDDINGS_DIR
         self.chunk_size = config.CHUNK_SIZE
-        
-        # Load embedding model
-        print(f"🔄 Loading embedding model: {config.EMBEDDING_MODEL}")
-        self.embedding_model = SentenceTransformer(config.EMBEDDING_MODEL)
-        print("✅ Embedding model loaded")
-    
-    def download_pdf(self, paper: Dict) -> str:
+
+        import torch
+
+        # Load embedding model on the best available device
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.embedding_model = None
+
+        if self.device == "cpu":
+            # Default intra-op thread count is often 1; using all cores
+            # speeds up CPU encode dramatically
+            torch.set_num_threads(os.cpu_count())
+            try:
+                torch.set_num_interop_threads(2)
+            except RuntimeError:
+                pass  # already initialized; intra-op setting still applies
+            print(f"🧵 CPU inference with {torch.get_num_threads()} threads")
+
+            # Prefer the quantized ONNX backend on CPU when optimum is
+            # installed; it's several times faster than eager PyTorch
+            try:
+                from helper.onnx_encoder import ONNXEncoder
+                onnx_dir = os.path.join(self.embeddings_dir, "onnx_model")
+                self.embedding_model = ONNXEncoder(config.EMBEDDING_MODEL, onnx_dir)
+                print(f"✅ Embedding model loaded (ONNX Runtime): {config.EMBEDDING_MODEL}")
+            except ImportError:
+                pass
+            except Exception as e:
+                print(f"  ⚠️ ONNX backend unavailable, using PyTorch: {str(e)}")
+
+        if self.embedding_model is None:
+            from sentence_transformers import SentenceTransformer
+
+            print(f"🔄 Loading embedding model: {config.EMBEDDING_MODEL} ({self.device})")
+            self.embedding_model = SentenceTransformer(config.EMBEDDING_MODEL, device=self.device)
+
+            # Half precision doubles effective throughput on GPU with
+            # negligible retrieval-quality impact; fall back to fp32 if
+            # the model or device rejects it
+            if self.device == "cuda":
+                try:
+                    if torch.cuda.is_bf16_supported():
+                        self.embedding_model = self.embedding_model.to(dtype=torch.bfloat16)
+                    else:
+                        self.embedding_model = self.embedding_model.half()
+                except Exception as e:
+                    print(f"  ⚠️ Half precision unavailable, using fp32: {str(e)}")
+                    self.embedding_model = SentenceTransformer(config.EMBEDDING_MODEL, device=self.device)
+
+            print("✅ Embedding model loaded")
+
+        # Pooled session so repeated downloads reuse the arXiv TLS
+        # connection, with retries for transient failures. When
+        # requests-cache is installed, use a CachedSession so reruns can
+        # revalidate via ETag/Last-Modified and get cheap 304s instead
+        # of full PDF bodies.
+        try:
+            import requests_cache
+            self.session = requests_cache.CachedSession(
+                os.path.join(self.cache_dir, "http_cache"),
+                expire_after=86400 * 30,
+                cache_control=True
+            )
+        except ImportError:
+            self.session = requests.Session()
+
+        # Memoize query embeddings per instance; decorating the method
+        # at class level would pin self in the cache forever
+        self._encode_query = functools.lru_cache(maxsize=128)(self._encode_query_impl)
+
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=8,
+            max_retries=Retry(total=3, backoff_factor=0.5)
+        ))
+
+    def download_pdf(self, paper: Paper) -> str:
         """
         Download PDF from arXiv
         
@@ -52,19 +187,58 @@ class PDFProcessor:
         print(f"  📥 Downloading PDF: {arxiv_id}")
         
         try:
-            response = requests.get(pdf_url, timeout=30)
-            response.raise_for_status()
-            
-            with open(pdf_path, 'wb') as f:
-                f.write(response.content)
-            
+            # Stream straight to disk instead of buffering the whole
+            # PDF in response.content
+            with self.session.get(pdf_url, timeout=30, stream=True) as response:
+                response.raise_for_status()
+
+                content_length = int(response.headers.get('Content-Length', 0))
+                if content_length > MAX_PDF_BYTES:
+                    print(f"  ⚠️ Skipping oversized PDF ({content_length} bytes): {arxiv_id}")
+                    return None
+
+                # Enforce the cap on actual bytes too — chunked or
+                # mislabeled responses carry no trustworthy Content-Length
+                written = 0
+                with open(pdf_path, 'wb') as f:
+                    for data in response.iter_content(chunk_size=1 << 16):
+                        written += len(data)
+                        if written > MAX_PDF_BYTES:
+                            raise ValueError(f"PDF exceeded {MAX_PDF_BYTES} bytes mid-download")
+                        f.write(data)
+
             print(f"  ✅ Downloaded: {pdf_path}")
             return pdf_path
-            
+
         except Exception as e:
             print(f"  ❌ Error downloading PDF: {str(e)}")
+            # Drop any partial file so a later run doesn't mistake it
+            # for a cached PDF
+            if os.path.exists(pdf_path):
+                try:
+                    os.remove(pdf_path)
+                except OSError:
+                    pass
             return None
-    
+
+    def download_pdfs(self, papers: List[Paper]) -> List[Optional[str]]:
+        """
+        Download several PDFs concurrently
+
+        Args:
+            papers: Papers with pdf_url
+
+        Returns:
+            PDF paths in the same order as papers (None where download failed)
+        """
+        if not papers:
+            return []
+
+        # Downloads are I/O-bound, so overlap them instead of paying
+        # each network round-trip serially
+        with ThreadPoolExecutor(max_workers=min(8, len(papers))) as executor:
+            return list(executor.map(self.download_pdf, papers))
+
     def extract_text_from_pdf(self, pdf_path: str) -> List[Dict]:
         """
         Extract text from PDF by sections
@@ -76,55 +250,45 @@ class PDFProcessor:
             List of text chunks with metadata
         """
         print(f"  📄 Extracting text from PDF...")
-        
-        doc = None
+
+        import fitz
+
         try:
             doc = fitz.open(pdf_path)
-            chunks = []
-            total_pages = len(doc)
-            
-            for page_num in range(total_pages):
-                page = doc[page_num]
-                text = page.get_text()
-                
-                # Split page text into chunks
-                words = text.split()
-                current_chunk = []
-                current_length = 0
-                
-                for word in words:
-                    current_chunk.append(word)
-                    current_length += len(word) + 1  # +1 for space
-                    
-                    if current_length >= self.chunk_size:
-                        chunk_text = ' '.join(current_chunk)
-                        chunks.append({
-                            'text': chunk_text,
-                            'page': page_num + 1,
-                            'chunk_id': len(chunks)
-                        })
-                        current_chunk = []
-                        current_length = 0
-                
-                # Add remaining text
-                if current_chunk:
-                    chunk_text = ' '.join(current_chunk)
-                    chunks.append({
-                        'text': chunk_text,
-                        'page': page_num + 1,
-                        'chunk_id': len(chunks)
-                    })
-            
+            try:
+                total_pages = len(doc)
+                if total_pages < MIN_PAGES_FOR_PROCESS_POOL:
+                    chunk_size = self.chunk_size  # hoist out of the page loop
+                    page_results = [
+                        _chunk_page_text(page.get_text("text", sort=True), page_num, chunk_size)
+                        for page_num, page in enumerate(doc)
+                    ]
+                else:
+                    # Large papers: chunk pages across worker processes,
+                    # each opening the PDF independently
+                    doc.close()
+                    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+                        page_results = list(executor.map(
+                            _extract_page_chunks,
+                            repeat(pdf_path),
+                            range(total_pages),
+                            repeat(self.chunk_size)
+                        ))
+            finally:
+                if not doc.is_closed:
+                    doc.close()
+
+            # Flatten in page order and renumber
+            chunks = [chunk for page_chunks in page_results for chunk in page_chunks]
+            for chunk_id, chunk in enumerate(chunks):
+                chunk['chunk_id'] = chunk_id
+
             print(f"  ✅ Extracted {len(chunks)} chunks from {total_pages} pages")
             return chunks
-            
+
         except Exception as e:
             print(f"  ❌ Error extracting text: {str(e)}")
             return []
-        finally:
-            # Ensure document is always closed
-            if doc is not None:
-                doc.close()
     
     def generate_embeddings(self, chunks: List[Dict]) -> np.ndarray:
         """
@@ -137,24 +301,56 @@ class PDFProcessor:
             Numpy array of embeddings
         """
         print(f"  🔢 Generating embeddings for {len(chunks)} chunks...")
-        
+
+        embeddings = self.generate_embeddings_bulk([chunks])[0]
+        if len(embeddings) > 0:
+            print(f"  ✅ Generated embeddings: {embeddings.shape}")
+        return embeddings
+
+    def generate_embeddings_bulk(self, papers_chunks: List[List[Dict]]) -> List[np.ndarray]:
+        """
+        Generate embeddings for several papers' chunks in one encode call
+
+        One large batched encode fills the device far better than a
+        per-paper loop, and sorting texts by length first keeps padding
+        per batch minimal (texts of similar length share a batch).
+
+        Args:
+            papers_chunks: One chunk list per paper
+
+        Returns:
+            One embeddings array per paper, in input order
+        """
+        texts = [chunk['text'] for chunks in papers_chunks for chunk in chunks]
+        if not texts:
+            return [np.array([]) for _ in papers_chunks]
+
         try:
-            texts = [chunk['text'] for chunk in chunks]
-            embeddings = self.embedding_model.encode(
-                texts,
-                show_progress_bar=True,
+            # Encode longest-first, then undo the permutation
+            order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+            sorted_embeddings = self.embedding_model.encode(
+                [texts[i] for i in order],
+                show_progress_bar=False,
                 convert_to_numpy=True,
-                batch_size=32
+                normalize_embeddings=True,
+                batch_size=128
             )
-            
-            print(f"  ✅ Generated embeddings: {embeddings.shape}")
-            return embeddings
-            
+            embeddings = np.empty_like(sorted_embeddings)
+            embeddings[order] = sorted_embeddings
+
+            # Slice the flat array back into per-paper arrays
+            results = []
+            offset = 0
+            for chunks in papers_chunks:
+                results.append(embeddings[offset:offset + len(chunks)])
+                offset += len(chunks)
+            return results
+
         except Exception as e:
             print(f"  ❌ Error generating embeddings: {str(e)}")
-            return np.array([])
-    
-    def process_paper(self, paper: Dict) -> Tuple[List[Dict], np.ndarray]:
+            return [np.array([]) for _ in papers_chunks]
+
+    def process_paper(self, paper: Paper) -> Tuple[List[Dict], np.ndarray]:
         """
         Complete pipeline: download, extract, embed
         
@@ -165,26 +361,72 @@ class PDFProcessor:
             Tuple of (chunks, embeddings)
         """
         print(f"\n📊 Processing paper: {paper['title'][:60]}...")
-        
+
+        # Embedding dominates runtime, so reuse cached chunks and
+        # vectors from earlier runs of the same paper
+        cache_path = os.path.join(self.embeddings_dir, f"{paper['arxiv_id']}.npz")
+        cached = self._load_embeddings_cache(cache_path)
+        if cached is not None:
+            print(f"  ✓ Embeddings already cached: {paper['arxiv_id']}")
+            return cached
+
         # Download PDF
         pdf_path = self.download_pdf(paper)
         if not pdf_path:
             return [], np.array([])
-        
+
         # Extract text
         chunks = self.extract_text_from_pdf(pdf_path)
         if not chunks:
             return [], np.array([])
-        
+
         # Generate embeddings
         embeddings = self.generate_embeddings(chunks)
         if len(embeddings) == 0:
             return chunks, np.array([])
-        
+
         print(f"  ✅ Embeddings ready ({embeddings.shape[0]} vectors)")
-        
+
+        self._save_embeddings_cache(cache_path, chunks, embeddings)
+
         return chunks, embeddings
+
+    def _load_embeddings_cache(self, cache_path: str) -> Optional[Tuple[List[Dict], np.ndarray]]:
+        """Return cached (chunks, embeddings) or None if absent/corrupt"""
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            data = np.load(cache_path, allow_pickle=True)
+            chunks = json.loads(data['chunks'].item())
+            embeddings = data['embeddings'].astype(np.float32)
+            # Restore the unit-norm invariant lost to fp16 rounding
+            embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+            return chunks, embeddings
+        except Exception as e:
+            print(f"  ⚠️ Ignoring corrupt embeddings cache: {str(e)}")
+            return None
+
+    def _save_embeddings_cache(self, cache_path: str, chunks: List[Dict], embeddings: np.ndarray) -> None:
+        try:
+            os.makedirs(self.embeddings_dir, exist_ok=True)
+            # fp16 on disk halves the file size; cosine ranking is
+            # insensitive to the precision loss
+            np.savez_compressed(
+                cache_path,
+                embeddings=embeddings.astype(np.float16),
+                chunks=np.array(json.dumps(chunks))
+            )
+        except Exception as e:
+            print(f"  ⚠️ Could not cache embeddings: {str(e)}")
     
+    def _encode_query_impl(self, query: str) -> np.ndarray:
+        """Encode one query to a unit-norm vector (wrapped by lru_cache)"""
+        return self.embedding_model.encode(
+            [query],
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )[0]
+
     def search_similar_chunks(
         self,
         query: str,
@@ -194,27 +436,48 @@ class PDFProcessor:
     ) -> List[Dict]:
         """
         Search for similar chunks using semantic search
-        
+
         Args:
             query: Search query
             chunks: List of text chunks
-            embeddings: Chunk embeddings
+            embeddings: Chunk embeddings (invariant: rows L2-normalized)
             top_k: Number of results to return
-            
+
         Returns:
             List of most similar chunks
         """
         if len(embeddings) == 0:
             return []
-        
-        # Encode query
-        query_embedding = self.embedding_model.encode([query], convert_to_numpy=True)
-        
-        # Calculate similarity
-        similarities = np.dot(embeddings, query_embedding.T).flatten()
-        
-        # Get top k indices
-        top_indices = np.argsort(similarities)[-top_k:][::-1]
+
+        # Tiny corpus: every chunk makes the cut anyway, so skip the
+        # query encode and matmul entirely
+        if len(chunks) <= top_k:
+            results = []
+            for chunk in chunks:
+                chunk = chunk.copy()
+                chunk['similarity_score'] = 1.0
+                results.append(chunk)
+            return results
+
+        # Embeddings from generate_embeddings are already unit-norm;
+        # normalize in place only if an external corpus isn't, so
+        # repeated queries stay a single matmul
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        if not np.allclose(norms, 1.0, atol=1e-3):
+            embeddings /= np.maximum(norms, 1e-12)
+
+        # Encode query (cached); with both sides L2-normalized, the dot
+        # product below is true cosine similarity
+        query_embedding = self._encode_query(query)[np.newaxis, :]
+
+        # float32 C-contiguous corpus lets np.dot hit a single BLAS call
+        corpus = np.ascontiguousarray(embeddings, dtype=np.float32)
+        similarities = np.dot(corpus, query_embedding.T.astype(np.float32)).flatten()
+
+        # Partition out the top k in O(n), then sort only those k
+        top_k = min(top_k, len(similarities))
+        top_indices = np.argpartition(-similarities, top_k - 1)[:top_k]
+        top_indices = top_indices[np.argsort(-similarities[top_indices])]
         
         # Return top chunks with similarity scores
         results = []
@@ -0,0 +1,69 @@
+"""
+Token-Bucket Rate Limiter
+Proactively spaces LLM API calls to stay under provider RPM/TPM limits
+"""
+
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """Throttle concurrent API calls below a requests/min and tokens/min ceiling"""
+
+    def __init__(self, max_rpm: int, max_tpm: int):
+        self.max_rpm = max_rpm
+        self.max_tpm = max_tpm
+
+        # Start with full buckets; replenished continuously at limit/60 per second
+        self.available_request_capacity = float(max_rpm)
+        self.available_token_capacity = float(max_tpm)
+        self.last_update = time.monotonic()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_tokens(prompt: str, max_tokens: int) -> int:
+        """Rough token estimate: ~4 chars per token plus the response budget"""
+        return len(prompt) // 4 + max_tokens
+
+    def _replenish(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.last_update
+        self.available_request_capacity = min(
+            float(self.max_rpm),
+            self.available_request_capacity + elapsed * self.max_rpm / 60.0
+        )
+        self.available_token_capacity = min(
+            float(self.max_tpm),
+            self.available_token_capacity + elapsed * self.max_tpm / 60.0
+        )
+        self.last_update = now
+
+    def acquire(self, estimated_tokens: int = 0) -> None:
+        """Block until one request slot and estimated_tokens of capacity are free"""
+        # The bucket never holds more than max_tpm, so an over-estimate
+        # larger than that could never be satisfied and would spin
+        # forever; let it through at full-bucket cost instead
+        estimated_tokens = min(estimated_tokens, self.max_tpm)
+        while True:
+            with self._lock:
+                self._replenish()
+                if (self.available_request_capacity >= 1.0
+                        and self.available_token_capacity >= estimated_tokens):
+                    self.available_request_capacity -= 1.0
+                    self.available_token_capacity -= estimated_tokens
+                    return
+            time.sleep(0.05)
+
+    async def acquire_async(self, estimated_tokens: int = 0) -> None:
+        """Like acquire, but yields to the event loop while waiting"""
+        estimated_tokens = min(estimated_tokens, self.max_tpm)
+        while True:
+            with self._lock:
+                self._replenish()
+                if (self.available_request_capacity >= 1.0
+                        and self.available_token_capacity >= estimated_tokens):
+                    self.available_request_capacity -= 1.0
+                    self.available_token_capacity -= estimated_tokens
+                    return
+            await asyncio.sleep(0.05)
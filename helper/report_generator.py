@@ -3,13 +3,35 @@ Report Generator
 Gemini generates structured report from paper analysis
 """
 
-import json
+# orjson parses Gemini's multi-KB report JSON several times faster than
+# the stdlib; fall back silently when it isn't installed
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
+import numpy as np
 from typing import Dict, List
+from helper.llm_cache import LLMCache
+from helper.paper import Paper
 from google import genai
 from groq import Groq
 import config
 
 
+def _truncate_at_word(text: str, limit: int) -> str:
+    """Trim to at most limit chars without chopping mid-word"""
+    if len(text) <= limit:
+        return text
+    truncated = text[:limit]
+    return truncated.rsplit(' ', 1)[0] if ' ' in truncated else truncated
+
+# Section divider for display formatting
+DIV = "━" * 78
+
+
 class ReportGenerator:
     """Generate structured reports using Gemini"""
     
@@ -21,10 +43,14 @@ class ReportGenerator:
         # Initialize Groq for key findings
         self.groq_client = Groq(api_key=config.GROQ_API_KEY)
         self.groq_model = config.GROQ_MODEL
+
+        # Findings are near-deterministic per paper, so cache them like
+        # the scoring calls
+        self.cache = LLMCache()
     
     def generate_key_findings(
         self,
-        paper: Dict,
+        paper: Paper,
         chunks: List[Dict],
         embeddings
     ) -> str:
@@ -41,18 +67,27 @@ class ReportGenerator:
         """
         print("\n🤖 Groq analyzing paper for key findings...")
         
-        # Get most important sections (introduction, methods, results, conclusion)
+        # Pick the ~10 most central chunks by mean similarity to the
+        # rest of the paper; with normalized embeddings this is one
+        # small matmul and gives far better context than stride
+        # sampling. Fall back to uniform stride when embeddings are
+        # missing.
         important_sections = []
-        
-        # Sample chunks evenly distributed through the paper
-        if len(chunks) > 0:
-            step = max(1, len(chunks) // 10)  # Get ~10 representative chunks
-            for i in range(0, len(chunks), step):
-                important_sections.append(chunks[i]['text'])
-        
-        # Combine sections
+        if embeddings is not None and len(embeddings) == len(chunks) > 0:
+            k = min(10, len(chunks))
+            centrality = (embeddings @ embeddings.T).mean(axis=1)
+            top_idx = np.argpartition(-centrality, k - 1)[:k]
+            top_idx.sort()  # keep paper order for readability
+            important_sections = [chunks[i]['text'] for i in top_idx]
+        elif len(chunks) > 0:
+            step = max(1, len(chunks) // 10)
+            important_sections = [chunks[i]['text'] for i in range(0, len(chunks), step)]
+
+        # Combine sections, truncated at a word boundary so Groq never
+        # sees a chopped token
         combined_text = "\n\n".join(important_sections[:10])  # Limit to avoid token overflow
-        
+        combined_text = _truncate_at_word(combined_text, 8000)
+
         prompt = f"""You are Agent A analyzing a research paper. Extract key findings for another agent (Gemini).
 
 Paper: {paper['title']}
@@ -60,7 +95,7 @@ Authors: {', '.join(paper['authors'][:5])}
 Abstract: {paper['abstract']}
 
 Selected Paper Sections:
-{combined_text[:8000]}
+{combined_text}
 
 Provide a comprehensive summary focusing on:
 1. Core Problem & Motivation
@@ -71,7 +106,15 @@ Provide a comprehensive summary focusing on:
 6. Practical Applications
 
 Be detailed and technical. This will help Gemini create a structured report."""
-        
+
+        # Same prompt + params means the same findings; skip the API
+        # round-trip on pipeline retries
+        cache_key = LLMCache.make_key(self.groq_model, prompt, 0.3, 2000)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            print(f"✅ Key findings served from cache ({len(cached)} chars)")
+            return cached
+
         try:
             response = self.groq_client.chat.completions.create(
                 model=self.groq_model,
@@ -82,8 +125,9 @@ Be detailed and technical. This will help Gemini create a structured report."""
                 temperature=0.3,
                 max_tokens=2000
             )
-            
+
             key_findings = response.choices[0].message.content.strip()
+            self.cache.set(cache_key, key_findings)
             print(f"✅ Key findings generated ({len(key_findings)} chars)")
             return key_findings
             
@@ -94,7 +138,7 @@ Be detailed and technical. This will help Gemini create a structured report."""
     
     def generate_structured_report(
         self,
-        paper: Dict,
+        paper: Paper,
         key_findings: str
     ) -> Dict:
         """
@@ -158,7 +202,7 @@ Be comprehensive, technical, and specific. This is for a portfolio project."""
             elif "```" in content:
                 content = content.split("```")[1].split("```")[0].strip()
             
-            report = json.loads(content)
+            report = _loads(content)
             
             # Add metadata
             report['paper_title'] = paper['title']
@@ -208,13 +252,15 @@ Be comprehensive, technical, and specific. This is for a portfolio project."""
         Returns:
             Formatted string
         """
-        formatted = f"""
+        # Collect parts and join once; repeated += on a growing string
+        # reallocates quadratically
+        parts = [f"""
 ╔══════════════════════════════════════════════════════════════════════════════╗
 ║                       📄 PROTOML DAILY PAPER SUMMARY                        ║
 ╚══════════════════════════════════════════════════════════════════════════════╝
 
 📌 PAPER INFORMATION
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{DIV}
 Title:      {report['paper_title']}
 Authors:    {', '.join(report['paper_authors'][:5])}{'...' if len(report['paper_authors']) > 5 else ''}
 Published:  {report['published']}
@@ -223,54 +269,56 @@ arXiv ID:   {report['arxiv_id']}
 PDF:        {report['pdf_url']}
 
 🎯 PROBLEM
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{DIV}
 {report['Problem']}
 
 📊 DATASET
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{DIV}
 {report['Dataset']}
 
 🤖 MODEL & METHODOLOGY
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{DIV}
 {report['Model']}
 
 🔑 KEY TECHNIQUES
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-"""
-        
+{DIV}
+"""]
+
         if isinstance(report['KeyTechniques'], list):
-            for i, technique in enumerate(report['KeyTechniques'], 1):
-                formatted += f"{i}. {technique}\n"
+            parts.extend(
+                f"{i}. {technique}\n"
+                for i, technique in enumerate(report['KeyTechniques'], 1)
+            )
         else:
-            formatted += f"{report['KeyTechniques']}\n"
-        
-        formatted += f"""
+            parts.append(f"{report['KeyTechniques']}\n")
+
+        parts.append(f"""
 📈 RESULTS
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{DIV}
 {report['Results']}
 
 💡 WHY IT MATTERS
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{DIV}
 {report['WhyItMatters']}
 
 🚀 MINI-PROJECT IDEA
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{DIV}
 {report['MiniImplementationIdea']}
 
 ⚠️  LIMITATIONS
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{DIV}
 {report['Limitations']}
 
 📝 ADDITIONAL NOTES
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{DIV}
 {report['AdditionalNotes']}
-"""
-        
+""")
+
         if 'selection_method' in report:
-            formatted += f"\n🏆 Selection Method: {report['selection_method']}\n"
+            parts.append(f"\n🏆 Selection Method: {report['selection_method']}\n")
         if 'final_decision_reasoning' in report:
-            formatted += f"   Decision Reasoning: {report['final_decision_reasoning']}\n"
-        
-        formatted += "\n" + "="*80 + "\n"
-        
-        return formatted
+            parts.append(f"   Decision Reasoning: {report['final_decision_reasoning']}\n")
+
+        parts.append("\n" + "=" * 80 + "\n")
+
+        return "".join(parts)
@@ -3,14 +3,6 @@ import json
 import os
 from datetime import datetime
 
-# Import helper modules
-from helper.arxiv_fetcher import ArxivFetcher
-from helper.paper_scorer import PaperScorer
-from helper.agent_debate import AgentDebate
-from helper.pdf_processor import PDFProcessor
-from helper.report_generator import ReportGenerator
-from helper.discord_notifier import DiscordNotifier
-
 import config
 
 
@@ -24,7 +16,16 @@ class ProtoML:
         
         # Validate API keys
         self._validate_config()
-        
+
+        # Import helpers only after validation passes; pdf_processor
+        # alone pulls in torch and takes seconds to load
+        from helper.arxiv_fetcher import ArxivFetcher
+        from helper.paper_scorer import PaperScorer
+        from helper.agent_debate import AgentDebate
+        from helper.pdf_processor import PDFProcessor
+        from helper.report_generator import ReportGenerator
+        from helper.discord_notifier import DiscordNotifier
+
         # Initialize components
         self.fetcher = ArxivFetcher()
         self.scorer = PaperScorer()
@@ -77,8 +78,9 @@ class ProtoML:
             print("STEP 3: AGENTS SCORE PAPERS")
             print("="*80)
             
-            groq_scored = self.scorer.score_with_groq(groq_papers)
-            gemini_scored = self.scorer.score_with_gemini(gemini_papers)
+            # Groq and Gemini target different APIs, so score both halves
+            # concurrently on one asyncio event loop
+            groq_scored, gemini_scored = self.scorer.score_papers(groq_papers, gemini_papers)
             
             # Display top choices
             print(f"\n🏆 Top Scores:")
@@ -90,17 +92,34 @@ class ProtoML:
             print("STEP 4: AGENT DEBATE & PAPER SELECTION")
             print("="*80)
             
+            # The winner is one of the two top papers, so prefetch both
+            # PDFs in the background while the agents debate; by Step 5
+            # the selected paper is usually already on disk
+            from concurrent.futures import ThreadPoolExecutor
+            prefetcher = ThreadPoolExecutor(max_workers=1)
+            prefetch = prefetcher.submit(
+                self.pdf_processor.download_pdfs, [groq_scored[0], gemini_scored[0]]
+            )
+
             selected_paper = self.debate.select_final_paper(groq_scored, gemini_scored)
-            
+
             print(f"\n✅ Final Paper Selected:")
             print(f"   {selected_paper['title']}")
             print(f"   arXiv ID: {selected_paper['arxiv_id']}")
-            
+
             # Step 5: Process PDF and generate embeddings
             print("\n" + "="*80)
             print("STEP 5: PDF PROCESSING & EMBEDDINGS")
             print("="*80)
-            
+
+            # Let the prefetch finish before processing so we never read
+            # a partially written PDF
+            try:
+                prefetch.result()
+            except Exception:
+                pass  # process_paper will retry the download itself
+            prefetcher.shutdown(wait=False)
+
             chunks, embeddings = self.pdf_processor.process_paper(selected_paper)
             
             if len(chunks) == 0: